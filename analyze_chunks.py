@@ -1,6 +1,10 @@
 import struct
 import sys
 
+_U32_LE = struct.Struct('<I')
+_CHUNK_HEADER = struct.Struct('<4sI')
+_FMT_CHUNK = struct.Struct('<HHIIHH')
+
 def analyze(path):
     print(f"--- {path} ---")
     with open(path, 'rb') as f:
@@ -8,31 +12,31 @@ def analyze(path):
         if header[:4] != b'RIFF':
             print("Not a RIFF file")
             return
-        file_size = struct.unpack('<I', header[4:8])[0]
+        file_size = _U32_LE.unpack_from(header, 4)[0]
         print(f"RIFF size: {file_size}")
         
+        # Chunks are walked strictly forward, so read sequentially and let
+        # buffering/readahead do the work instead of seeking to every chunk.
         pos = 12
         while True:
-            f.seek(pos)
-            tag_raw = f.read(4)
-            if not tag_raw or len(tag_raw) < 4:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
                 break
+            tag_raw, size = _CHUNK_HEADER.unpack(chunk_header)
             tag = tag_raw.decode(errors='replace')
-            size_raw = f.read(4)
-            if not size_raw or len(size_raw) < 4:
-                break
-            size = struct.unpack('<I', size_raw)[0]
             print(f"Chunk: {tag} at {pos:x}, size: {size}")
-            
+            padded_size = size + (size & 1)
+
             if tag == 'fmt ':
-                f.seek(pos + 8)
-                fmt_data = f.read(min(size, 16))
-                wFormatTag, nChannels, nSamplesPerSec, nAvgBytesPerSec, nBlockAlign, wBitsPerSample = struct.unpack('<HHIIHH', fmt_data)
+                body = f.read(padded_size)
+                fmt_data = body[:16]
+                wFormatTag, nChannels, nSamplesPerSec, nAvgBytesPerSec, nBlockAlign, wBitsPerSample = _FMT_CHUNK.unpack(fmt_data)
                 print(f"  fmt: {wFormatTag=}, {nChannels=}, {nSamplesPerSec=}, {wBitsPerSample=}")
-            
-            pos += 8 + size
-            if size % 2 == 1:
-                pos += 1
+            else:
+                # Skip over the body (e.g. large 'data' chunks) without reading it.
+                f.seek(padded_size, 1)
+
+            pos += 8 + padded_size
             if pos >= file_size + 8:
                 break
 
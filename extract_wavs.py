@@ -23,13 +23,61 @@ Usage:
 Example:
     python3 extract_wavs.py MyKit.stk extracted_samples/
 """
+import mmap
+import os
 import struct
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+_U32_LE = struct.Struct('<I')
 
+# Linux can copy file-to-file inside the kernel with sendfile(2).
+_USE_SENDFILE = sys.platform.startswith('linux') and hasattr(os, 'sendfile')
 
-def extract_wavs(stk_path: Path, output_dir: Path):
+
+def _find_riffs(buf, start: int, max_count: int) -> list[tuple[int, int]]:
+    """
+    Locate up to max_count embedded RIFF files in buf, starting at offset start.
+
+    Returns a list of (offset, total_size) pairs, where total_size includes the
+    8-byte RIFF header. buf must support find() and the buffer protocol (bytes, mmap).
+    """
+    riffs = []
+    pos = start
+    while len(riffs) < max_count:
+        # Look for the next RIFF header; anything before it is padding.
+        # find() runs the search in C rather than stepping byte by byte.
+        pos = buf.find(b'RIFF', pos)
+        if pos < 0 or pos + 8 > len(buf):
+            break
+        if pos & 1:
+            # Samples sit on even offsets (RIFF chunks are word-aligned),
+            # so an odd hit is a stray 'RIFF' inside audio data.
+            pos += 1
+            continue
+        size = _U32_LE.unpack_from(buf, pos + 4)[0]
+        total_size = size + 8
+        riffs.append((pos, total_size))
+        pos += total_size
+    return riffs
+
+
+def _sendfile_range(src_fd: int, out_file: Path, offset: int, count: int):
+    """Copy count bytes at offset of src_fd into out_file without a userspace copy."""
+    dst_fd = os.open(out_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        while count > 0:
+            sent = os.sendfile(dst_fd, src_fd, offset, count)
+            if sent == 0:
+                break  # end of the source file
+            offset += sent
+            count -= sent
+    finally:
+        os.close(dst_fd)
+
+
+def extract_wavs(stk_path: Path, output_dir: Path) -> list[Path]:
     """
     Extract WAV files from a Sonicware STK kit file.
 
@@ -42,50 +90,58 @@ def extract_wavs(stk_path: Path, output_dir: Path):
         output_dir: Path to the directory where extracted WAV files will be saved
 
     Returns:
-        None. Prints extraction progress to stdout and writes WAV files to output_dir.
+        List of the WAV files written to output_dir, in sample order. Progress is
+        also printed to stdout.
     """
     if not stk_path.exists():
         print(f"File not found: {stk_path}")
-        return
+        return []
 
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    with open(stk_path, 'rb') as f:
-        data = f.read()
-
-    # KTDT body ends at 0x10A4 (4260 bytes) - this is the metadata/header section
-    # containing kit information. The actual audio data follows after this offset.
-    audio_data = data[0x10A4:]
-    
-    pos = 0
-    count = 0
-    while pos < len(audio_data):
-        # Look for RIFF header
-        if audio_data[pos:pos+4] == b'RIFF':
-            # Read size
-            size = struct.unpack('<I', audio_data[pos+4:pos+8])[0]
-            total_size = size + 8
-            wav_content = audio_data[pos : pos + total_size]
-            
-            out_file = output_dir / f"sample_{count:02d}.wav"
-            out_file.write_bytes(wav_content)
-            print(f"Extracted {out_file} ({total_size} bytes)")
-            
-            pos += total_size
-            count += 1
-            if count >= 15:
-                break
-        else:
-            # Maybe some padding?
-            pos += 1
-            if pos > len(audio_data) - 8:
-                break
-
-    print(f"Extracted {count} samples.")
-
-if __name__ == "__main__":
+    if stk_path.stat().st_size == 0:
+        # mmap refuses empty files, and there is nothing to extract anyway.
+        print("Extracted 0 samples.")
+        return []
+
+    # Map the kit instead of reading it: slicing a memoryview is zero-copy,
+    # so each sample is only touched once, when it is written out.
+    with open(stk_path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+            memoryview(mm) as mv:
+        # KTDT body ends at 0x10A4 (4260 bytes) - this is the metadata/header section
+        # containing kit information. The actual audio data follows after this offset.
+        riffs = _find_riffs(mm, 0x10A4, 15)
+        out_files = [output_dir / f"sample_{i:02d}.wav" for i in range(len(riffs))]
+
+        def write_sample(out_file, riff):
+            pos, total_size = riff
+            if _USE_SENDFILE:
+                try:
+                    _sendfile_range(f.fileno(), out_file, pos, total_size)
+                    return
+                except OSError:
+                    pass  # e.g. unsupported filesystem; copy through userspace
+            with open(out_file, 'wb') as out:
+                out.write(mv[pos : pos + total_size])
+
+        # The samples are independent files; writing them concurrently lets
+        # the OS overlap file creation and writes (file I/O releases the GIL).
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            list(ex.map(write_sample, out_files, riffs))
+
+    for out_file, (_, total_size) in zip(out_files, riffs):
+        print(f"Extracted {out_file} ({total_size} bytes)")
+
+    print(f"Extracted {len(riffs)} samples.")
+    return out_files
+
+def main():
     if len(sys.argv) < 3:
         print("Usage: python3 extract_wavs.py <input.stk> <output_dir>")
         sys.exit(1)
     
     extract_wavs(Path(sys.argv[1]), Path(sys.argv[2]))
+
+if __name__ == "__main__":
+    main()
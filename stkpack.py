@@ -30,13 +30,43 @@ Usage:
 """
 import argparse
 import datetime as _dt
+import functools
+import hashlib
+import heapq
 import io
+import math
+import mmap
+import os
+import shutil
 import struct
 import subprocess
 import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 import wave
-import audioop
+try:
+    import audioop
+except ImportError:  # removed from the stdlib in Python 3.13
+    audioop = None
+
+# Optional accelerators: NumPy for channel mixing, SciPy for polyphase
+# resampling. Without them the stdlib audioop path is used; where audioop
+# is gone (Python 3.13+), conversion needs these or ffmpeg.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    from scipy import signal as _signal
+except ImportError:
+    _signal = None
+
+# ffmpeg's libswresample (SIMD resampling and mixing) is preferred for any
+# conversion when it is on the PATH.
+_FFMPEG = shutil.which('ffmpeg')
+
+# Whether _resample uses the whole-signal SciPy path rather than audioop.ratecv.
+_RESAMPLE_WHOLE = np is not None and _signal is not None
 
 #4228
 KTDT_SIZE = 0x1084
@@ -48,6 +78,29 @@ TARGET_RATE = 48000
 TARGET_WIDTH = 2  # bytes -> 16-bit
 TARGET_CHANNELS = 1  # mono
 
+# Frames per block when converting through audioop (see _to_pcm16_48k).
+_BLOCK_FRAMES = 65536
+# Input files from this size up are memory-mapped (see _read_wav_bytes).
+_MMAP_MIN_SIZE = 1 << 20
+
+# Precompiled formats for the fixed-width fields written on every pack.
+_U32_LE = struct.Struct('<I')
+_PARAM_SUFFIX = struct.Struct('<BBBBi8xB7x')  # see _get_param_suffix
+_KTDT_ENTRY = struct.Struct('<256s24s')  # path, parameter suffix
+_KTDT_TAIL = struct.Struct('<12s4sIII')  # footer, then first ISDT block
+_ISDT_BLOCK = struct.Struct('<2s4sIII')  # separator, then ISDT block (see _write_stk)
+
+# File header (32 bytes before the KTDT body); identical for every kit.
+_STK_HEADER = (MAGIC
+               + HEADER_RESERVED
+               + _U32_LE.pack(0x10)  # Offset to KTDT tag?
+               + KTDT_TAG
+               + _U32_LE.pack(KTDT_SIZE)
+               + HEADER_RESERVED  # reserved
+               + _U32_LE.pack(1))  # version/marker
+_FMT_CHUNK = struct.Struct('<4sIHHIIHH')  # 'fmt ' tag, size and PCM fields
+_CHUNK_HEADER = struct.Struct('<4sI')  # RIFF chunk tag and size
+
 # Standard parameter suffix for each 280-byte entry.
 # Layout (24 bytes):
 # 0: Volume (0-100, default 100)
@@ -57,28 +110,17 @@ TARGET_CHANNELS = 1  # mono
 # 6-15: Zeros (Reserved/Padding)
 # 16: FX Send (0-127, default 0)
 # 17-23: Zeros
-def _get_param_suffix(volume=100, pitch=0, pan=0, fx_send=0, pad_index=None, probe_mode=False):
-    if probe_mode and pad_index is not None:
-        return _get_probe_param_suffix(pad_index)
-        
+@functools.lru_cache(maxsize=256)
+def _get_param_suffix(volume, pitch, pan, fx_send):
     # Volume: Byte 0
     # Pan: Byte 1 (-64 to 63)
     # Byte 2-3: Set to 00 7F as observed in factory kits
     # Byte 4-7: Pitch (as cents, signed 32-bit integer)
-    
+    # Byte 8-15: Zeros
     # FX Send: Byte 16 (0-127)
-    
-    buf = bytearray(24)
-    buf[0] = volume & 0xFF
-    buf[1] = pan & 0xFF
-    buf[2] = 0x00
-    buf[3] = 0x7F
-    buf[4:8] = struct.pack('<i', pitch)
-    # buf[8:16] remains 0
-    buf[16] = fx_send & 0xFF
-    # buf[17:24] remains 0
-    
-    return bytes(buf)
+    # Byte 17-23: Zeros
+    # Kits mostly repeat the defaults, so each distinct row is packed once.
+    return _PARAM_SUFFIX.pack(volume & 0xFF, pan & 0xFF, 0x00, 0x7F, pitch, fx_send & 0xFF)
 
 def _get_probe_param_suffix(i):
     """Generate a unique parameter suffix for a probe kit pad to identify pitch location."""
@@ -156,74 +198,254 @@ KTDT_FOOTER = b"\x00" * 8 + b"\x64\x00\x00\x00"
 
 
 def _read_wav_bytes(path: Path) -> bytes:
-    return path.read_bytes()
+    """Return the contents of a WAV file. Large files are mapped read-only
+    rather than copied onto the heap; release them with _close_wav_bytes."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < _MMAP_MIN_SIZE:
+            return f.read()
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _close_wav_bytes(raw) -> None:
+    if isinstance(raw, mmap.mmap):
+        try:
+            raw.close()
+        except BufferError:
+            pass  # still viewed from a pending traceback; unmapped when that goes
+
+
+def _convert_file(path: Path, target_channels: int) -> bytes:
+    """Read and convert one file; lets process workers take a path instead
+    of having the sample data pickled over to them."""
+    raw = _read_wav_bytes(path)
+    try:
+        return _to_pcm16_48k(raw, target_channels)
+    finally:
+        _close_wav_bytes(raw)
+
+
+# Target fmt chunk per channel count; only mono and stereo are written.
+_FMT_CHUNKS = {nch: _FMT_CHUNK.pack(b"fmt ", 16, 1, nch, TARGET_RATE,
+                                    TARGET_RATE * nch * TARGET_WIDTH,
+                                    nch * TARGET_WIDTH, TARGET_WIDTH * 8)
+               for nch in (1, 2)}
+# RIFF size minus the data payload: 'WAVE', fmt, cue, LIST, data header.
+_WAV_OVERHEAD = 4 + len(_FMT_CHUNKS[1]) + len(CUE_CHUNK) + len(LIST_CHUNK) + 8
+
+
+def _wav_header(data_len: int, nch: int) -> bytes:
+    """Everything _wrap_wav writes before the sample data: RIFF header,
+    fmt, cue, LIST and the data chunk header."""
+    return b"".join([b"RIFF", _U32_LE.pack(_WAV_OVERHEAD + data_len), b"WAVE",
+                     _FMT_CHUNKS[nch], CUE_CHUNK, LIST_CHUNK,
+                     b"data", _U32_LE.pack(data_len)])
+
+
+def _wrap_wav(frames: bytes, nch: int) -> bytes:
+    """Wrap 48kHz 16-bit PCM frames in the chunk layout of working kits:
+    fmt, cue, LIST, then data."""
+    return b"".join([_wav_header(len(frames), nch), frames])
+
+
+def _convert_width(frames: bytes, sampwidth: int) -> bytes:
+    """Convert PCM frames of sampwidth bytes per sample to 16-bit signed PCM.
+
+    8-bit WAV data is unsigned and is re-centred first; wider samples keep
+    their two most significant bytes (the same truncation as audioop.lin2lin).
+    """
+    if np is not None:
+        if sampwidth == 1:
+            a = np.frombuffer(frames, np.uint8)
+            return ((a.astype('<i2') - 128) << 8).astype('<i2').tobytes()
+        # Little-endian: the top two bytes of each sample form its int16 value.
+        b = np.frombuffer(frames, np.uint8).reshape(-1, sampwidth)
+        return np.ascontiguousarray(b[:, sampwidth - 2:]).tobytes()
+
+    if sampwidth == 1:
+        frames = audioop.bias(frames, 1, -128)
+    return audioop.lin2lin(frames, sampwidth, TARGET_WIDTH)
+
+
+def _convert_channels(frames: bytes, nch: int, target_channels: int) -> bytes:
+    """Mix 16-bit PCM frames from nch channels down/up to target_channels."""
+    if np is not None:
+        a = np.frombuffer(frames, '<i2').reshape(-1, nch)
+        if nch == 1:
+            mono = a[:, 0]
+        else:
+            # Integer accumulator so the sum cannot overflow int16
+            mono = (a.sum(axis=1, dtype=np.int32) // nch).astype('<i2')
+        if target_channels == 2:
+            mono = np.repeat(mono[:, None], 2, axis=1)
+        return mono.tobytes()
+
+    if target_channels == 1:
+        # Downmix to mono
+        return audioop.tomono(frames, TARGET_WIDTH, 1/nch, 1/nch)
+    elif target_channels == 2 and nch == 1:
+        # Expand mono to stereo
+        return audioop.tostereo(frames, TARGET_WIDTH, 1, 1)
+    else:
+        # Multi-channel to stereo: downmix to mono first, then to stereo
+        # (or we could just use tomono and then tostereo)
+        mono_frames = audioop.tomono(frames, TARGET_WIDTH, 1/nch, 1/nch)
+        return audioop.tostereo(mono_frames, TARGET_WIDTH, 1, 1)
+
+
+def _poly_ratio(fr: int) -> tuple[int, int]:
+    """Reduced (up, down) factors taking fr to TARGET_RATE."""
+    g = math.gcd(fr, TARGET_RATE)
+    return TARGET_RATE // g, fr // g
+
+
+@functools.lru_cache(maxsize=32)
+def _poly_kernel(up: int, down: int):
+    """Design the anti-aliasing low-pass FIR for an up/down polyphase resampler.
+
+    Kaiser-windowed sinc (beta 8.6, ~90 dB stopband) with 10 zero crossings per
+    side, cut off at the lower of the two Nyquist rates. Cached, since a kit's
+    samples usually share one source rate; the array is shared, so read-only.
+    """
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    h = _signal.firwin(2 * half_len + 1, 1.0 / max_rate,
+                       window=('kaiser', 8.6)).astype(np.float32)
+    h.flags.writeable = False
+    return h
+
+
+def _resample(frames: bytes, nch: int, fr: int, state=None) -> tuple[bytes, object]:
+    """Resample interleaved 16-bit PCM frames from fr to TARGET_RATE.
+
+    Returns (frames, state). The audioop fallback can be fed consecutive
+    blocks by passing the returned state back in; the SciPy path needs the
+    whole signal in one call and always returns None.
+    """
+    if _RESAMPLE_WHOLE:
+        up, down = _poly_ratio(fr)
+        x = np.frombuffer(frames, '<i2').reshape(-1, nch).astype(np.float32)
+        # resample_poly runs the kernel through upfirdn's polyphase filter
+        # (only the non-zero taps of each output phase are evaluated).
+        y = _signal.resample_poly(x, up, down, axis=0, window=_poly_kernel(up, down))
+        return np.clip(np.rint(y), -32768, 32767).astype('<i2').tobytes(), None
+
+    # audioop.ratecv returns (converted_data, state)
+    return audioop.ratecv(frames, TARGET_WIDTH, nch, fr, TARGET_RATE, state)
+
+
+def _ffmpeg_convert(raw: bytes, target_channels: int) -> bytes:
+    """Convert WAV bytes to raw 48kHz 16-bit PCM frames with ffmpeg."""
+    cmd = [_FFMPEG, '-v', 'error', '-i', 'pipe:0',
+           '-ar', str(TARGET_RATE), '-ac', str(target_channels),
+           '-f', 's16le', 'pipe:1']
+    return subprocess.run(cmd, input=raw, capture_output=True, check=True).stdout
+
+
+def _fast_wav_probe(raw: bytes):
+    """Locate the PCM payload of a plain WAV file by walking its chunk headers.
+
+    Returns (nchannels, sampwidth, framerate, data_offset, data_len), or None
+    if the file is not uncompressed PCM or is laid out in a way this probe
+    does not handle; callers then fall back to the wave module.
+    """
+    if len(raw) < 12 or raw[0:4] != b"RIFF" or raw[8:12] != b"WAVE":
+        return None
+    fmt = None
+    off = 12
+    while off + 8 <= len(raw):
+        tag, size = _CHUNK_HEADER.unpack_from(raw, off)
+        if tag == b"fmt ":
+            if size < 16 or off + 24 > len(raw):
+                return None
+            _, _, audio_format, nch, fr, _, _, bits = _FMT_CHUNK.unpack_from(raw, off)
+            if audio_format != 1 or nch == 0 or bits not in (8, 16, 24, 32):
+                return None
+            fmt = (nch, bits // 8, fr)
+        elif tag == b"data":
+            if fmt is None:
+                return None
+            nch, sampwidth, fr = fmt
+            start = off + 8
+            # Like wave, ignore a truncated chunk's missing tail and any partial frame.
+            data_len = min(size, len(raw) - start)
+            data_len -= data_len % (nch * sampwidth)
+            return nch, sampwidth, fr, start, data_len
+        off += 8 + size + (size & 1)
+    return None
 
 
 def _to_pcm16_48k(raw: bytes, target_channels: int) -> bytes:
     """Convert a WAV file (bytes) to 48kHz, 16-bit PCM WAV bytes.
-    Uses wave+audioop from the stdlib; handles PCM formats.
+    Uses ffmpeg, NumPy/SciPy or the stdlib audioop, whichever is available;
+    handles PCM formats.
     """
-    with wave.open(io.BytesIO(raw), 'rb') as r:
-        nch = r.getnchannels()
-        sampwidth = r.getsampwidth()
-        fr = r.getframerate()
-        nframes = r.getnframes()
-        comp = r.getcomptype()
-        if comp not in (b'NONE', 'NONE'):
-            raise ValueError(f"Unsupported compressed WAV (comptype={comp})")
-        frames = r.readframes(nframes)
-
-    # Convert bit depth to 16-bit linear PCM if needed
-    if sampwidth != TARGET_WIDTH:
-        frames = audioop.lin2lin(frames, sampwidth, TARGET_WIDTH)
-        sampwidth = TARGET_WIDTH
-
-    # Convert channels
-    if nch != target_channels:
-        if target_channels == 1:
-            # Downmix to mono
-            frames = audioop.tomono(frames, sampwidth, 1/nch, 1/nch)
-        elif target_channels == 2 and nch == 1:
-            # Expand mono to stereo
-            frames = audioop.tostereo(frames, sampwidth, 1, 1)
-        else:
-            # Multi-channel to stereo: downmix to mono first, then to stereo
-            # (or we could just use tomono and then tostereo)
-            mono_frames = audioop.tomono(frames, sampwidth, 1/nch, 1/nch)
-            frames = audioop.tostereo(mono_frames, sampwidth, 1, 1)
-        nch = target_channels
-
-    # Resample to 48kHz
-    if fr != TARGET_RATE:
-        # audioop.ratecv returns (converted_data, state)
-        frames, _ = audioop.ratecv(frames, sampwidth, nch, fr, TARGET_RATE, None)
-        fr = TARGET_RATE
-
-    # Build a new standard WAV container
-    out_b = io.BytesIO()
-    with wave.open(out_b, 'wb') as w:
-        w.setnchannels(target_channels)
-        w.setsampwidth(TARGET_WIDTH)
-        w.setframerate(TARGET_RATE)
-        w.writeframes(frames)
-    
+    probe = _fast_wav_probe(raw)
+    if probe is not None:
+        # Canonical PCM: slice the payload straight out of the file bytes.
+        nch, sampwidth, fr, start, data_len = probe
+        pcm = memoryview(raw)[start : start + data_len]
+        # Samples extracted from an existing kit are already in exactly
+        # the layout _wrap_wav writes; hand the file back untouched.
+        if (sampwidth == TARGET_WIDTH and fr == TARGET_RATE and nch == target_channels
+                and start + data_len == len(raw)
+                and raw[:start] == _wav_header(data_len, nch)):
+            return bytes(raw)  # no copy for bytes; detaches a mapped input
+    else:
+        with wave.open(io.BytesIO(raw), 'rb') as r:
+            nch = r.getnchannels()
+            sampwidth = r.getsampwidth()
+            fr = r.getframerate()
+            nframes = r.getnframes()
+            comp = r.getcomptype()
+            if comp not in (b'NONE', 'NONE'):
+                raise ValueError(f"Unsupported compressed WAV (comptype={comp})")
+            pcm = r.readframes(nframes)
+
+    # Already 48kHz/16-bit with the right channel count (the common case for
+    # curated sample packs): no conversion or re-encoding needed.
+    if sampwidth == TARGET_WIDTH and fr == TARGET_RATE and nch == target_channels:
+        return _wrap_wav(pcm, target_channels)
+
+    if _FFMPEG is not None:
+        try:
+            frames = _ffmpeg_convert(raw, target_channels)
+            return _wrap_wav(frames, target_channels)
+        except (OSError, subprocess.CalledProcessError):
+            pass  # fall back to the pure-Python conversion below
+
+    if audioop is None and (
+            (np is None and (sampwidth != TARGET_WIDTH or nch != target_channels))
+            or (fr != TARGET_RATE and not _RESAMPLE_WHOLE)):
+        raise ValueError(f"Converting {nch}ch/{sampwidth * 8}-bit/{fr}Hz audio needs ffmpeg "
+                         "or numpy and scipy on this Python (no audioop module)")
+
+    # The audioop stages are stateless apart from ratecv, which carries
+    # its state between calls, so the stdlib path converts block by block
+    # instead of holding every intermediate buffer for the whole file.
+    # The SciPy resampler needs the whole signal at once.
+    frame_size = nch * sampwidth
+    block = max(len(pcm), 1) if _RESAMPLE_WHOLE else _BLOCK_FRAMES * frame_size
+    out = bytearray()
+    state = None
+    for pos in range(0, len(pcm), block):
+        frames = pcm[pos : pos + block]
+
+        # Convert bit depth to 16-bit linear PCM if needed
+        if sampwidth != TARGET_WIDTH:
+            frames = _convert_width(frames, sampwidth)
+
+        # Convert channels
+        if nch != target_channels:
+            frames = _convert_channels(frames, nch, target_channels)
+
+        # Resample to 48kHz
+        if fr != TARGET_RATE:
+            frames, state = _resample(frames, target_channels, fr, state)
+
+        out += frames
+
     # Mirror structure of working kits: fmt, cue, LIST, then data.
-    # We must insert the extra chunks and update the RIFF size.
-    orig = out_b.getvalue()
-    # RIFF header (12) + fmt chunk (16+8) + data tag/size (8) + audio data
-    fmt_chunk = orig[12:12+24]
-    data_tag_size = orig[12+24:12+24+8]
-    audio_data = orig[12+24+8:]
-    
-    new_riff_size = 4 + len(fmt_chunk) + len(CUE_CHUNK) + len(LIST_CHUNK) + len(data_tag_size) + len(audio_data)
-    
-    final = (b"RIFF" + struct.pack('<I', new_riff_size) + b"WAVE"
-             + fmt_chunk
-             + CUE_CHUNK
-             + LIST_CHUNK
-             + data_tag_size
-             + audio_data)
-    return final
+    return _wrap_wav(out, target_channels)
 
 
 def _pick_samples(folder: Path, files: list[Path], target_channels: int) -> tuple[list[bytes], list[str]]:
@@ -231,26 +453,64 @@ def _pick_samples(folder: Path, files: list[Path], target_channels: int) -> tupl
     selected: list[Path] = []
 
     if folder is not None:
-        wavs = sorted([p for p in folder.iterdir() if p.is_file() and p.suffix.lower() == '.wav'])
-        selected = wavs[:15]
+        # scandir's entries know their type without a stat per file, and only
+        # the first 15 in sorted order are needed, not a full sort.
+        with os.scandir(folder) as it:
+            wavs = [p for p, e in ((Path(e.path), e) for e in it)
+                    if p.suffix.lower() == '.wav' and e.is_file()]
+        selected = heapq.nsmallest(15, wavs)
     elif files:
         selected = files[:15]
     else:
         raise ValueError("Provide a --folder or at least one WAV file")
 
-    # Convert all
+    # Convert all. Conversions are independent, so run them concurrently;
+    # map() keeps the original order. ffmpeg runs out of process and
+    # NumPy/SciPy release the GIL, so threads suffice there and avoid pickling
+    # sample data; the pure audioop path holds the GIL and needs processes.
+    # Identical sources (copies, symlinks, a file passed twice) are keyed by
+    # a digest of their contents and converted only once.
+    # Process workers are handed paths and read the files themselves.
+    names: list[str] = [p.stem for p in selected]
+    raws = [_read_wav_bytes(p) for p in selected]
+    try:
+        keys = [hashlib.sha1(raw).digest() for raw in raws]
+        unique = dict(zip(keys, raws))
+        tcs = [target_channels] * len(unique)
+        if len(unique) > 1:
+            workers = min(len(unique), os.cpu_count() or 1)
+            if _FFMPEG is not None or _RESAMPLE_WHOLE:
+                if _FFMPEG is None:
+                    # Design each distinct resampling kernel once up front
+                    # instead of letting the threads race to cache it.
+                    for raw in unique.values():
+                        probe = _fast_wav_probe(raw)
+                        if probe is not None and probe[2] != TARGET_RATE:
+                            _poly_kernel(*_poly_ratio(probe[2]))
+                with ThreadPoolExecutor(max_workers=workers) as ex:
+                    results = list(ex.map(_to_pcm16_48k, unique.values(), tcs))
+            else:
+                paths = dict(zip(keys, selected))
+                with ProcessPoolExecutor(max_workers=workers) as ex:
+                    results = list(ex.map(_convert_file, paths.values(), tcs))
+        else:
+            results = [_to_pcm16_48k(raw, target_channels) for raw in unique.values()]
+    finally:
+        for raw in raws:
+            _close_wav_bytes(raw)
+    convert_cache = dict(zip(unique, results))
     converted: list[bytes] = []
-    names: list[str] = []
-    for p in selected:
-        b = _read_wav_bytes(p)
-        converted.append(_to_pcm16_48k(b, target_channels))
-        names.append(p.stem)
+    # Track the smallest (by total byte length of WAV) for padding below.
+    min_len, min_idx = math.inf, -1
+    for k in keys:
+        wav = convert_cache[k]
+        if len(wav) < min_len:
+            min_len, min_idx = len(wav), len(converted)
+        converted.append(wav)
 
     # If fewer than 15: pad with duplicates of the smallest (by data length)
     if len(converted) < 15:
-        # pick the smallest by total byte length of WAV
-        min_idx = min(range(len(converted)), key=lambda i: len(converted[i])) if converted else None
-        if min_idx is None:
+        if min_idx < 0:
             raise ValueError("No WAV files found to pad from")
         smallest = converted[min_idx]
         smallest_name = names[min_idx]
@@ -266,54 +526,66 @@ def _pick_samples(folder: Path, files: list[Path], target_channels: int) -> tupl
 def _make_paths(title: str, names: list[str]) -> list[bytes]:
     # Internal path format observed: SmplTrek/Pool/Audio/Drum/<folder>/<file>.wav\0
     # We'll use fixed root plus title basename
-    root_str = f"SmplTrek/Pool/Audio/Drum/{title}"
+    root_bytes = f"SmplTrek/Pool/Audio/Drum/{title}/".encode('utf-8')
     # ensure ASCII/UTF-8 safe bytes
-    paths: list[bytes] = []
-    for name in names:
-        s = f"{root_str}/{name}.wav".encode('utf-8') + b"\x00"
-        paths.append(s)
-    return paths
+    paths = [root_bytes + name.encode('utf-8') + b".wav\x00" for name in names]
+    # Each path field is 256 bytes including the terminating null; check once
+    # here and pad to the full field so _build_ktdt copies fixed-size blocks.
+    for name, path in zip(names, paths):
+        if len(path) > 256:
+            raise ValueError(f"Internal path for '{name}' is {len(path)} bytes (max 256); "
+                             "use a shorter --title or sample file name")
+    return [path.ljust(256, b"\x00") for path in paths]
+
+
+def _build_ktdt_template() -> bytes:
+    """KTDT body with everything that does not depend on the kit filled in:
+    default parameters on every entry, the footer, and the first ISDT's tag
+    and constant."""
+    buf = bytearray(KTDT_SIZE)
+    default_suffix = _get_param_suffix(100, 0, 0, 0)
+    for i in range(15):
+        _KTDT_ENTRY.pack_into(buf, i * 280, b"", default_suffix)
+    _KTDT_TAIL.pack_into(buf, 4200, KTDT_FOOTER, b"ISDT", 0, 0, 0x01)
+    return bytes(buf)
+
+
+_KTDT_TEMPLATE = _build_ktdt_template()
 
 
-def _build_ktdt(paths: list[bytes], first_wav_len: int, params: list[dict] = None, probe_mode: bool = False) -> bytes:
+def _build_ktdt(paths: list[bytes], first_wav_len: int, params: list[dict] = None, probe_mode: bool = False) -> bytearray:
     # Each entry is 280 bytes. Path at offset 0, params at offset 256.
     # Total 15 * 280 = 4200.
     # KTDT_SIZE is 4228 (0x1084).
     # Footer (12 bytes) starts at 4200.
     # First ISDT (16 bytes) starts at 4212.
+    # Start from the prebuilt template; only paths, non-default parameters
+    # and the first ISDT size need writing.
     entry_size = 280
-    buf = bytearray(KTDT_SIZE)
+    buf = bytearray(_KTDT_TEMPLATE)
+    mv = memoryview(buf)
     for i in range(15):
         off = i * entry_size
-        path = paths[i]
-        if len(path) > 256:
-            path = path[:255] + b"\x00"
-        buf[off : off + len(path)] = path
-        
-        p = params[i] if params and i < len(params) else {}
-        suffix = _get_param_suffix(
-            volume=p.get('volume', 100),
-            pitch=p.get('pitch', 0),
-            pan=p.get('pan', 0),
-            fx_send=p.get('fx_send', 0),
-            pad_index=i,
-            probe_mode=probe_mode
-        )
-        buf[off + 256 : off + 256 + 24] = suffix
-    
-    # Add footer
-    buf[4200 : 4200 + 12] = KTDT_FOOTER
-    
-    # Add first ISDT (index 0)
+        mv[off : off + 256] = paths[i]
+
+        if probe_mode:
+            mv[off + 256 : off + 256 + 24] = _get_probe_param_suffix(i)
+        elif params and i < len(params):
+            p = params[i]
+            mv[off + 256 : off + 256 + 24] = _get_param_suffix(
+                p.get('volume', 100), p.get('pitch', 0), p.get('pan', 0), p.get('fx_send', 0))
+
+    # Footer and first ISDT (index 0) come from the template, except the size.
     # ISDT block: "ISDT", size (4), index (4), unknown constant (4)
     # The 'size' field in ISDT appears to be len(wav) + 26 bytes in the reference file?
     # No, RIFF_SIZE is len(wav) - 8. 
     # Reference: ISDT_SIZE_FIELD = RIFF_SIZE + 26 = (len(wav) - 8) + 26 = len(wav) + 18.
     isdt_size = first_wav_len + 18
-    isdt = b"ISDT" + struct.pack('<I', isdt_size) + struct.pack('<I', 0) + b"\x01\x00\x00\x00"
-    buf[4212 : 4212 + 16] = isdt
-    
-    return bytes(buf)
+    _U32_LE.pack_into(buf, 4216, isdt_size)
+    mv.release()
+
+    # Returned as-is: the writer accepts any bytes-like object.
+    return buf
 
 
 def _prompt_int(prompt, default, min_val, max_val):
@@ -388,40 +660,48 @@ def _customize_samples(wavs: list[bytes], names: list[str]) -> list[dict]:
     return params
 
 
-def _write_stk(out_path: Path, ktdt_body: bytes, wavs: list[bytes]):
+def _writev_all(fd: int, buffers: list) -> None:
+    """os.writev every buffer to fd, resuming after short writes."""
+    buffers = [memoryview(b) for b in buffers]
+    while buffers:
+        written = os.writev(fd, buffers)
+        # Drop what was fully written and trim a partially written buffer.
+        while buffers and written >= len(buffers[0]):
+            written -= len(buffers[0])
+            buffers.pop(0)
+        if buffers and written:
+            buffers[0] = buffers[0][written:]
+
+
+def _write_stk(out_path: Path, ktdt_body: bytearray, wavs: list[bytes]):
+    # KTDT body starts at 0x20, right after the fixed header.
+    # It now includes the 12-byte footer and the first ISDT block.
+    parts = [_STK_HEADER, ktdt_body]
+
+    # Append WAVs with ISDT prefix
+    # First sample's ISDT is already in ktdt_body.
+    for i, w in enumerate(wavs):
+        if i > 0:
+            # Reference kits have two null bytes between samples, then the
+            # ISDT block: "ISDT", size (4), index (4), unknown constant (4)
+            # Size field is len(wav) + 18.
+            # The separator is folded into the header: one part per block.
+            parts.append(_ISDT_BLOCK.pack(b"\x00\x00", b"ISDT", len(w) + 18, i, 0x01))
+        parts.append(w)
+    if wavs:
+        # For the very last one, we add \x00\x00.
+        parts.append(b"\x00\x00")
+
+    # Hand every piece to the kernel in one scatter-gather call where
+    # available: one syscall, and the WAV buffers are never copied.
+    # Elsewhere the buffered writer coalesces the small headers and passes
+    # WAVs larger than its buffer straight through, so the file is never
+    # assembled in memory either.
     with open(out_path, 'wb') as f:
-        # Header (32 bytes total before KTDT body)
-        f.write(MAGIC)
-        f.write(b"\x00" * 4)
-        f.write(struct.pack('<I', 0x10))  # Offset to KTDT tag?
-        f.write(KTDT_TAG)
-        f.write(struct.pack('<I', KTDT_SIZE))
-        f.write(b"\x00" * 4)  # reserved
-        f.write(struct.pack('<I', 1))  # version/marker
-        # KTDT body starts at 0x20
-        # It now includes the 12-byte footer and the first ISDT block.
-        f.write(ktdt_body)
-        
-        # Append WAVs with ISDT prefix
-        # First sample's ISDT is already in ktdt_body.
-        for i, w in enumerate(wavs):
-            if i == 0:
-                # First sample only writes the WAV data.
-                f.write(w)
-            else:
-                # ISDT block: "ISDT", size (4), index (4), unknown constant (4)
-                # Size field is len(wav) + 18.
-                isdt_size = len(w) + 18
-                isdt = b"\x00\x00ISDT" + struct.pack('<I', isdt_size) + struct.pack('<I', i) + b"\x01\x00\x00\x00"
-                f.write(isdt)
-                f.write(w)
-            
-            # Pad each sample to 2-byte boundary if needed? 
-            # Reference kits seem to have two null bytes between samples (including the one inside ISDT prefix if we consider it part of it).
-            # We already write \x00\x00ISDT for i > 0.
-            # For the very last one, we add \x00\x00.
-            if i == (len(wavs) - 1):
-                f.write(b"\x00\x00")
+        if hasattr(os, 'writev'):
+            _writev_all(f.fileno(), parts)
+        else:
+            f.writelines(parts)
 
 def parse_args(argv=None):
     ap = argparse.ArgumentParser(description="Pack up to 15 WAV files into a .stk kit")
@@ -466,8 +746,8 @@ def main(argv=None):
             raise SystemExit("\nCustomization cancelled.")
 
     # Build KTDT and write file
-    paths = _make_paths(args.title, names)
     try:
+        paths = _make_paths(args.title, names)
         first_wav_len = len(wavs[0]) if wavs else 0
         ktdt = _build_ktdt(paths, first_wav_len, params=params, probe_mode=args.probe_pitch)
     except Exception as e: